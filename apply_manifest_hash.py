@@ -12,35 +12,78 @@ import argparse
 import sys
 from pathlib import Path
 
+# orjson (opcional) serializa el JSON indentado en C, mucho más rápido que json.dump
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Tamaño del bloque de lectura al calcular hashes (1 MiB)
+HASH_CHUNK_SIZE = 1024 * 1024
+
 def calculate_sha256(file_path):
     """Calcula el hash SHA256 de un archivo"""
-    sha256_hash = hashlib.sha256()
     try:
-        with open(file_path, "rb") as f:
-            # Leer el archivo en chunks para archivos grandes
-            for chunk in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(chunk)
+        with open(file_path, "rb", buffering=0) as f:
+            # hashlib.file_digest (Python 3.11+) ejecuta el bucle de lectura en C
+            if hasattr(hashlib, "file_digest"):
+                return hashlib.file_digest(f, "sha256").hexdigest()
+            sha256_hash = hashlib.sha256()
+            # Leer el archivo en chunks grandes reutilizando el mismo buffer
+            buffer = bytearray(HASH_CHUNK_SIZE)
+            view = memoryview(buffer)
+            while True:
+                read = f.readinto(buffer)
+                if not read:
+                    break
+                sha256_hash.update(view[:read])
         return sha256_hash.hexdigest()
     except Exception as e:
         print(f"Error al calcular hash de {file_path}: {e}")
         return None
 
+def save_json(file_path, data):
+    """Guarda un objeto como JSON indentado (con orjson si está disponible)"""
+    if orjson is not None:
+        try:
+            content = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        except TypeError:
+            # Datos que orjson no soporta (p. ej. enteros de más de 64 bits): usar json estándar
+            content = None
+        if content is not None:
+            with open(file_path, 'wb') as f:
+                f.write(content)
+            return
+    # newline='\n': saltos de línea LF en todos los sistemas, igual que la salida de orjson
+    with open(file_path, 'w', encoding='utf-8', newline='\n') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
 def generate_manifest_hash(manifest_data):
     """Genera un hash SHA256 del contenido del manifest (sin incluir hash_manifest)"""
-    # Crear una copia del manifest sin la clave hash_manifest
-    manifest_copy = manifest_data.copy()
-    if 'hash_manifest' in manifest_copy:
-        del manifest_copy['hash_manifest']
-
-    # Serializar JSON en formato compacto (sin espacios, sin saltos de línea)
-    # Esto es equivalente a Formatting.None en C# con Newtonsoft.Json
-    manifest_json = json.dumps(manifest_copy, separators=(',', ':'), ensure_ascii=False)
-    
-    print(f"JSON serializado para hash (compacto):")
-    print(manifest_json)
-    
-    # Calcular hash SHA-256
-    return hashlib.sha256(manifest_json.encode('utf-8')).hexdigest()
+    # Quitar temporalmente la clave hash_manifest en lugar de copiar el manifest; se guardan los
+    # nombres de las claves que la siguen para devolverla a su posición original
+    has_hash = 'hash_manifest' in manifest_data
+    if has_hash:
+        keys = list(manifest_data)
+        following_keys = keys[keys.index('hash_manifest') + 1:]
+    stored_hash = manifest_data.pop('hash_manifest', None)
+    try:
+        # Serializar JSON en formato compacto (sin espacios, sin saltos de línea)
+        # Esto es equivalente a Formatting.None en C# con Newtonsoft.Json
+        # json.dumps en una sola llamada usa el codificador en C, más rápido que iterencode
+        # (Python puro) aunque construya el JSON completo en memoria
+        manifest_json = json.dumps(manifest_data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        
+        print(f"JSON serializado para hash (compacto): {len(manifest_json):,} bytes")
+        
+        # Calcular hash SHA-256
+        return hashlib.sha256(manifest_json).hexdigest()
+    finally:
+        if has_hash:
+            manifest_data['hash_manifest'] = stored_hash
+            # Volver a mover al final las claves que estaban después, en el mismo orden
+            for following_key in following_keys:
+                manifest_data[following_key] = manifest_data.pop(following_key)
 
 def validate_manifest_hash(manifest_data):
     """Valida que el hash_manifest del archivo es correcto"""
@@ -122,8 +165,7 @@ def main():
     
     # Guardar el archivo actualizado
     try:
-        with open(args.source, 'w', encoding='utf-8') as f:
-            json.dump(manifest_data, f, indent=2, ensure_ascii=False)
+        save_json(args.source, manifest_data)
         
         print(f"\n✅ Hash aplicado exitosamente al archivo: {args.source}")
         print(f"Hash agregado: {manifest_hash}")
@@ -6,11 +6,52 @@ Genera un archivo JSON con información de la versión, incluyendo archivo ZIP c
 """
 
 import os
+import sys
 import json
 import hashlib
+import shutil
+import tarfile
+import tempfile
 import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+# orjson (opcional) serializa el JSON indentado en C, mucho más rápido que json.dump
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# zstandard (opcional) permite publicar además un .tar.zst, más rápido de comprimir y descomprimir
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# zlib-ng (opcional) tiene la misma API que zlib, con deflate y CRC32 acelerados por SIMD
+try:
+    from zlib_ng import zlib_ng as zlib
+except ImportError:
+    import zlib
+
+# Nivel de compresión zstd del archivo .tar.zst
+ZSTD_LEVEL = 3
+
+# Archivos hasta este tamaño se comprimen en paralelo en procesos aparte (64 MiB);
+# los más grandes se comprimen en streaming desde el proceso principal para no cargarlos en memoria
+PARALLEL_ZIP_MAX_SIZE = 64 * 1024 * 1024
+
+# ProcessPoolExecutor no admite más de 61 procesos en Windows
+WINDOWS_MAX_PROCESS_WORKERS = 61
+
+# Tamaño del bloque al comprimir en streaming los archivos grandes (4 MiB)
+LARGE_FILE_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Máximo de bytes (sin comprimir) de archivos enviados al pool y aún no escritos en el ZIP (256 MiB);
+# evita acumular resultados en memoria mientras el proceso principal escribe un archivo grande
+ZIP_PENDING_MAX_BYTES = 256 * 1024 * 1024
+
 def read_version(version_file):
     """Lee la versión del archivo version.txt"""
     try:
@@ -21,6 +62,22 @@ def read_version(version_file):
         print(f"Error al leer versión de {version_file}: {e}")
         return "0.0.0"
 
+def save_json(file_path, data):
+    """Guarda un objeto como JSON indentado (con orjson si está disponible)"""
+    if orjson is not None:
+        try:
+            content = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        except TypeError:
+            # Datos que orjson no soporta (p. ej. enteros de más de 64 bits): usar json estándar
+            content = None
+        if content is not None:
+            with open(file_path, 'wb') as f:
+                f.write(content)
+            return
+    # newline='\n': saltos de línea LF en todos los sistemas, igual que la salida de orjson
+    with open(file_path, 'w', encoding='utf-8', newline='\n') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
 def get_uncompressed_size(manifest_file):
     """Obtiene el tamaño descomprimido desde el files_manifest.json"""
     try:
@@ -34,42 +91,196 @@ def get_uncompressed_size(manifest_file):
         print(f"Error al leer manifest {manifest_file}: {e}")
         return 0
 
+def walk_files(directory_path):
+    """Recorre recursivamente un directorio con os.scandir y genera las entradas de archivo
+
+    Mantiene el mismo orden que os.walk: primero los archivos de cada carpeta y después sus subcarpetas.
+    """
+    subdirs = []
+    with os.scandir(directory_path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+            elif entry.is_file():
+                yield entry
+    for subdir in subdirs:
+        yield from walk_files(subdir)
+
+class HashingWriter:
+    """Envuelve un archivo de salida y calcula el SHA256 de todo lo que se escribe en él
+
+    No expone seek: así zipfile escribe el ZIP de forma secuencial y el hash coincide con el archivo final.
+    """
+    
+    def __init__(self, file):
+        self.file = file
+        self.sha256_hash = hashlib.sha256()
+    
+    def write(self, data):
+        self.sha256_hash.update(data)
+        return self.file.write(data)
+    
+    def tell(self):
+        return self.file.tell()
+    
+    def flush(self):
+        self.file.flush()
+    
+    def close(self):
+        self.file.close()
+    
+    def hexdigest(self):
+        return self.sha256_hash.hexdigest()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+def compress_file(file_path):
+    """Comprime un archivo con deflate crudo, igual que ZIP_DEFLATED (se ejecuta en los procesos del pool)"""
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+    compressed_data = compressor.compress(data) + compressor.flush()
+    return zlib.crc32(data), len(data), compressed_data
+
+def compress_large_file(file_path, temp_dir):
+    """Comprime un archivo grande con deflate crudo en streaming hacia un archivo temporal
+
+    Así se conocen el CRC y los tamaños antes de escribir la cabecera local sin cargar el archivo en memoria.
+    Retorna (crc, tamaño, archivo temporal al inicio de los datos comprimidos); quien lo recibe debe cerrarlo.
+    """
+    compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+    crc = 0
+    file_size = 0
+    temp_file = tempfile.TemporaryFile(dir=temp_dir)
+    try:
+        with open(file_path, 'rb') as f:
+            while True:
+                chunk = f.read(LARGE_FILE_CHUNK_SIZE)
+                if not chunk:
+                    break
+                crc = zlib.crc32(chunk, crc)
+                file_size += len(chunk)
+                temp_file.write(compressor.compress(chunk))
+        temp_file.write(compressor.flush())
+        temp_file.seek(0)
+    except BaseException:
+        temp_file.close()
+        raise
+    return crc, file_size, temp_file
+
+def compress_files_in_order(executor, files, max_pending, max_pending_bytes=ZIP_PENDING_MAX_BYTES):
+    """Genera en orden los resultados de compress_file (None para archivos grandes)
+
+    Limita tanto la cantidad de tareas pendientes como los bytes que suman sus archivos.
+    """
+    pending = deque()
+    pending_bytes = 0
+    for file_path, file_size in files:
+        if file_size <= PARALLEL_ZIP_MAX_SIZE:
+            pending.append((executor.submit(compress_file, file_path), file_size))
+            pending_bytes += file_size
+        else:
+            pending.append((None, 0))
+        while len(pending) > max_pending or pending_bytes > max_pending_bytes:
+            future, file_size = pending.popleft()
+            pending_bytes -= file_size
+            yield future.result() if future is not None else None
+    while pending:
+        future, _ = pending.popleft()
+        yield future.result() if future is not None else None
+
+def write_compressed_entry(zipf, file_path, relative_path, compressed):
+    """Agrega al ZIP un archivo ya comprimido con deflate, escribiendo su cabecera local
+
+    Los datos comprimidos pueden venir en bytes (compress_file) o en un archivo abierto (compress_large_file);
+    como el CRC y los tamaños se conocen de antemano, la cabecera local los lleva sin data descriptor.
+    """
+    crc, file_size, compressed_data = compressed
+    zinfo = zipfile.ZipInfo.from_file(file_path, relative_path)
+    zinfo.compress_type = zipfile.ZIP_DEFLATED
+    zinfo.CRC = crc
+    zinfo.file_size = file_size
+    if isinstance(compressed_data, bytes):
+        zinfo.compress_size = len(compressed_data)
+    else:
+        zinfo.compress_size = compressed_data.seek(0, os.SEEK_END)
+        compressed_data.seek(0)
+    
+    # zipfile no permite escribir datos ya comprimidos; se replica lo que hace ZipFile.write
+    # (FileHeader agrega la extensión ZIP64 solo si los tamaños la necesitan)
+    zinfo.header_offset = zipf.fp.tell()
+    zipf.fp.write(zinfo.FileHeader())
+    if isinstance(compressed_data, bytes):
+        zipf.fp.write(compressed_data)
+    else:
+        shutil.copyfileobj(compressed_data, zipf.fp, LARGE_FILE_CHUNK_SIZE)
+    zipf.filelist.append(zinfo)
+    zipf.NameToInfo[zinfo.filename] = zinfo
+    zipf.start_dir = zipf.fp.tell()
+
 def create_zip_file(source_dir, zip_filename):
-    """Crea un archivo ZIP con el contenido de la carpeta (sin incluir la carpeta en sí)"""
+    """Crea un archivo ZIP con el contenido de la carpeta (sin incluir la carpeta en sí)
+
+    Retorna el hash SHA256 del ZIP, calculado mientras se escribe, o None si hubo un error.
+    """
     try:
-        with zipfile.ZipFile(zip_filename, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            # Recorrer todos los archivos en el directorio
-            for root, dirs, files in os.walk(source_dir):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    
-                    # Calcular la ruta relativa para el ZIP (sin incluir el directorio base)
-                    relative_path = os.path.relpath(file_path, source_dir)
-                    
-                    # Agregar archivo al ZIP
-                    zipf.write(file_path, relative_path)
-                    print(f"Agregado al ZIP: {relative_path}")
+        # Recorrer todos los archivos en el directorio
+        files = []
+        for entry in walk_files(source_dir):
+            # Calcular la ruta relativa para el ZIP (sin incluir el directorio base)
+            relative_path = os.path.relpath(entry.path, source_dir)
+            files.append((entry.path, relative_path, entry.stat().st_size))
+        
+        # Los archivos se comprimen en paralelo y se escriben en el ZIP en el orden del recorrido;
+        # los grandes se comprimen aquí a un temporal junto al ZIP
+        max_workers = os.cpu_count() or 1
+        if sys.platform == 'win32':
+            max_workers = min(max_workers, WINDOWS_MAX_PROCESS_WORKERS)
+        temp_dir = os.path.dirname(os.path.abspath(zip_filename))
+        with HashingWriter(open(zip_filename, 'wb')) as writer, \
+                zipfile.ZipFile(writer, 'w', zipfile.ZIP_DEFLATED) as zipf, \
+                ProcessPoolExecutor(max_workers=max_workers) as executor:
+            compressed_files = compress_files_in_order(
+                executor, [(file_path, file_size) for file_path, _, file_size in files], max_workers * 4)
+            for (file_path, relative_path, _), compressed in zip(files, compressed_files):
+                # Agregar archivo al ZIP
+                if compressed is None:
+                    compressed = compress_large_file(file_path, temp_dir)
+                    with compressed[2]:
+                        write_compressed_entry(zipf, file_path, relative_path, compressed)
+                else:
+                    write_compressed_entry(zipf, file_path, relative_path, compressed)
+                print(f"Agregado al ZIP: {relative_path}")
         
         print(f"Archivo ZIP creado exitosamente: {zip_filename}")
-        return True
+        return writer.hexdigest()
     except Exception as e:
         print(f"Error al crear archivo ZIP: {e}")
-        return False
+        return None
+
+def create_tar_zst_file(source_dir, tar_filename):
+    """Crea un archivo .tar.zst con el contenido de la carpeta (requiere zstandard)
 
-def calculate_zip_hash(zip_filename):
-    """Calcula el hash SHA256 del archivo ZIP"""
+    Retorna el hash SHA256 del archivo, calculado mientras se escribe, o None si hubo un error.
+    """
     try:
-        sha256_hash = hashlib.sha256()
-        with open(zip_filename, "rb") as f:
-            # Leer el archivo en chunks para archivos grandes
-            for chunk in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(chunk)
+        # threads=-1 usa todos los núcleos para comprimir
+        compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL, threads=-1)
+        with HashingWriter(open(tar_filename, 'wb')) as writer:
+            with compressor.stream_writer(writer) as zstd_stream, \
+                    tarfile.open(fileobj=zstd_stream, mode='w|') as tar:
+                for entry in walk_files(source_dir):
+                    relative_path = os.path.relpath(entry.path, source_dir)
+                    tar.add(entry.path, arcname=relative_path, recursive=False)
         
-        hash_value = sha256_hash.hexdigest()
-        print(f"Hash SHA256 del ZIP: {hash_value}")
-        return hash_value
+        print(f"Archivo .tar.zst creado exitosamente: {tar_filename}")
+        return writer.hexdigest()
     except Exception as e:
-        print(f"Error al calcular hash del ZIP: {e}")
+        print(f"Error al crear archivo .tar.zst: {e}")
         return None
 
 def get_zip_size(zip_filename):
@@ -82,9 +293,12 @@ def get_zip_size(zip_filename):
         print(f"Error al obtener tamaño del ZIP: {e}")
         return 0
 
-def generate_release_info(version, tag, filename, download_url, compressed_size, uncompressed_size, sha256):
-    """Genera la estructura JSON de información de release"""
-    return {
+def generate_release_info(version, tag, filename, download_url, compressed_size, uncompressed_size, sha256, tar_zst=None):
+    """Genera la estructura JSON de información de release
+
+    tar_zst, si se indica, describe el archivo .tar.zst alternativo (filename, download_url, compressed_size, sha256).
+    """
+    release_info = {
         version: {
             "tag": tag,
             "filename": filename,
@@ -94,6 +308,9 @@ def generate_release_info(version, tag, filename, download_url, compressed_size,
             "sha256": sha256
         }
     }
+    if tar_zst is not None:
+        release_info[version]["tar_zst"] = tar_zst
+    return release_info
 
 def main():
     """Función principal"""
@@ -135,25 +352,41 @@ def main():
     print(f"Nombre del archivo ZIP: {zip_filename}")
     
     # Crear archivo ZIP
+    # El hash SHA256 se calcula mientras se escribe el ZIP, sin volver a leerlo
     print(f"\nCreando archivo ZIP desde {makebuild_dir}...")
-    if not create_zip_file(makebuild_dir, zip_path):
+    sha256_hash = create_zip_file(makebuild_dir, zip_path)
+    if not sha256_hash:
         print("Error: No se pudo crear el archivo ZIP")
         return
+    print(f"Hash SHA256 del ZIP: {sha256_hash}")
     
     # Calcular tamaño comprimido
     compressed_size = get_zip_size(zip_path)
     
-    # Calcular hash SHA256 del ZIP
-    print("\nCalculando hash SHA256 del archivo ZIP...")
-    sha256_hash = calculate_zip_hash(zip_path)
-    if not sha256_hash:
-        print("Error: No se pudo calcular el hash del ZIP")
-        return
-    
-    # Generar información de release
     tag = f"v{version}-base"
     download_url = f"https://github.com/orion-system/edupie-releases/releases/download/{tag}/{zip_filename}"
     
+    # Crear también un .tar.zst si zstandard está instalado; el ZIP se mantiene por compatibilidad
+    tar_zst_info = None
+    if zstandard is not None:
+        tar_filename = f"edupie-base-v{version}.tar.zst"
+        tar_path = os.path.join(version_dir, tar_filename)
+        print(f"\nCreando archivo .tar.zst desde {makebuild_dir}...")
+        tar_hash = create_tar_zst_file(makebuild_dir, tar_path)
+        if tar_hash:
+            tar_size = os.path.getsize(tar_path)
+            print(f"Hash SHA256 del .tar.zst: {tar_hash}")
+            print(f"Tamaño del .tar.zst: {tar_size:,} bytes ({tar_size / (1024*1024):.2f} MB)")
+            tar_zst_info = {
+                "filename": tar_filename,
+                "download_url": f"https://github.com/orion-system/edupie-releases/releases/download/{tag}/{tar_filename}",
+                "compressed_size": tar_size,
+                "sha256": tar_hash
+            }
+    else:
+        print("\nzstandard no está instalado: se omite el archivo .tar.zst")
+    
+    # Generar información de release
     release_info = generate_release_info(
         version=version,
         tag=tag,
@@ -161,18 +394,20 @@ def main():
         download_url=download_url,
         compressed_size=compressed_size,
         uncompressed_size=uncompressed_size,
-        sha256=sha256_hash
+        sha256=sha256_hash,
+        tar_zst=tar_zst_info
     )
     
     # Guardar archivo JSON
     try:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(release_info, f, indent=2, ensure_ascii=False)
+        save_json(output_file, release_info)
         
         print(f"\n✅ Información de release generada exitosamente: {output_file}")
         print(f"📦 Archivo ZIP: {zip_path}")
         print(f"📊 Tamaño comprimido: {compressed_size:,} bytes ({compressed_size / (1024*1024):.2f} MB)")
         print(f"📊 Tamaño descomprimido: {uncompressed_size:,} bytes ({uncompressed_size / (1024*1024*1024):.2f} GB)")
+        if tar_zst_info is not None:
+            print(f"📦 Archivo .tar.zst: {tar_zst_info['filename']} ({tar_zst_info['compressed_size']:,} bytes)")
         print(f"🔗 URL de descarga: {download_url}")
         print(f"🏷️  Tag: {tag}")
         print(f"📁 Ubicación: {version_dir}")
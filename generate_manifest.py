@@ -10,29 +10,47 @@ import json
 import hashlib
 import argparse
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-def calculate_sha256(file_path):
-    """Calcula el hash SHA256 de un archivo"""
-    sha256_hash = hashlib.sha256()
+# orjson (opcional) serializa el JSON indentado en C, mucho más rápido que json.dump
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Tamaño del bloque de lectura al calcular hashes (1 MiB)
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Los archivos menores a este tamaño se leen y hashean en una sola llamada (1 MiB)
+SMALL_FILE_SIZE = 1024 * 1024
+
+def calculate_sha256(file_path, file_size=None):
+    """Calcula el hash SHA256 de un archivo (file_size evita un stat extra si ya se conoce)"""
     try:
-        with open(file_path, "rb") as f:
-            # Leer el archivo en chunks para archivos grandes
-            for chunk in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(chunk)
+        with open(file_path, "rb", buffering=0) as f:
+            if file_size is None:
+                file_size = os.fstat(f.fileno()).st_size
+            # Los archivos pequeños se leen completos y se hashean con una sola llamada
+            if file_size < SMALL_FILE_SIZE:
+                return hashlib.sha256(f.read()).hexdigest()
+            # hashlib.file_digest (Python 3.11+) ejecuta el bucle de lectura en C
+            if hasattr(hashlib, "file_digest"):
+                return hashlib.file_digest(f, "sha256").hexdigest()
+            sha256_hash = hashlib.sha256()
+            # Leer el archivo en chunks grandes reutilizando el mismo buffer
+            buffer = bytearray(HASH_CHUNK_SIZE)
+            view = memoryview(buffer)
+            while True:
+                read = f.readinto(buffer)
+                if not read:
+                    break
+                sha256_hash.update(view[:read])
         return sha256_hash.hexdigest()
     except Exception as e:
         print(f"Error al calcular hash de {file_path}: {e}")
         return None
 
-def get_file_size(file_path):
-    """Obtiene el tamaño de un archivo en bytes"""
-    try:
-        return os.path.getsize(file_path)
-    except Exception as e:
-        print(f"Error al obtener tamaño de {file_path}: {e}")
-        return 0
-
 def read_version(version_file):
     """Lee la versión del archivo version.txt"""
     try:
@@ -43,30 +61,131 @@ def read_version(version_file):
         print(f"Error al leer versión de {version_file}: {e}")
         return "0.0.0"
 
-def scan_directory(directory_path, base_path=""):
-    """Escanea recursivamente un directorio y retorna información de todos los archivos"""
-    files_info = []
+def save_json(file_path, data):
+    """Guarda un objeto como JSON indentado (con orjson si está disponible)"""
+    if orjson is not None:
+        try:
+            content = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        except TypeError:
+            # Datos que orjson no soporta (p. ej. enteros de más de 64 bits): usar json estándar
+            content = None
+        if content is not None:
+            with open(file_path, 'wb') as f:
+                f.write(content)
+            return
+    # newline='\n': saltos de línea LF en todos los sistemas, igual que la salida de orjson
+    with open(file_path, 'w', encoding='utf-8', newline='\n') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+def load_hash_cache(cache_file):
+    """Lee la caché de hashes de ejecuciones anteriores (ruta -> tamaño, fecha de modificación y hash)"""
+    if not os.path.exists(cache_file):
+        return {}
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Error al leer caché de hashes {cache_file}: {e}")
+        return {}
+
+def save_hash_cache(cache_file, hash_cache):
+    """Guarda la caché de hashes para la próxima ejecución"""
+    try:
+        cache_dir = os.path.dirname(cache_file)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump(hash_cache, f, ensure_ascii=False)
+    except Exception as e:
+        print(f"Error al guardar caché de hashes {cache_file}: {e}")
+
+def get_cached_hash(hash_cache, relative_path, file_stat):
+    """Retorna el hash guardado si el tamaño y la fecha de modificación del archivo no cambiaron"""
+    if hash_cache is None:
+        return None
+    cached = hash_cache.get(relative_path)
+    if cached and cached.get("size") == file_stat.st_size and cached.get("mtime_ns") == file_stat.st_mtime_ns:
+        return cached.get("sha256")
+    return None
+
+def update_hash_cache(hash_cache, relative_path, file_stat, file_hash):
+    """Registra el hash de un archivo junto con su tamaño y fecha de modificación"""
+    if hash_cache is not None:
+        hash_cache[relative_path] = {
+            "size": file_stat.st_size,
+            "mtime_ns": file_stat.st_mtime_ns,
+            "sha256": file_hash
+        }
+
+def walk_files(directory_path):
+    """Recorre recursivamente un directorio con os.scandir y genera las entradas de archivo
+
+    Mantiene el mismo orden que os.walk: primero los archivos de cada carpeta y después sus subcarpetas.
+    """
+    subdirs = []
+    with os.scandir(directory_path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+            elif entry.is_file():
+                yield entry
+    for subdir in subdirs:
+        yield from walk_files(subdir)
+
+def scan_directory(directory_path, base_path="", hash_cache=None, max_workers=None):
+    """Escanea recursivamente un directorio y retorna información de todos los archivos
+
+    Si se indica hash_cache, solo se calcula el hash de los archivos cuyo tamaño o fecha de modificación cambió.
+    max_workers indica cuántos archivos se hashean a la vez (por defecto, uno por CPU).
+    """
+    # Validar antes del try: un error aquí no debe terminar en un manifest con la carpeta vacía
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    elif max_workers < 1:
+        raise ValueError(f"max_workers debe ser al menos 1 (se recibió {max_workers})")
+    
+    # Los datos se acumulan en listas paralelas y los diccionarios se crean una sola vez al final
+    paths = []
+    sizes = []
+    sha256s = []
     
     try:
-        for root, dirs, files in os.walk(directory_path):
-            for file in files:
-                file_path = os.path.join(root, file)
-                
-                # Calcular la ruta relativa sin incluir el directorio base
-                relative_path = os.path.relpath(file_path, directory_path)
-                if base_path:
-                    relative_path = os.path.join(base_path, relative_path)
-                
-                # Calcular hash y tamaño
-                file_hash = calculate_sha256(file_path)
-                file_size = get_file_size(file_path)
+        # Reunir primero la lista de archivos para repartir el cálculo de hashes
+        pending_files = []
+        for entry in walk_files(directory_path):
+            # Calcular la ruta relativa sin incluir el directorio base
+            relative_path = os.path.relpath(entry.path, directory_path)
+            if base_path:
+                relative_path = os.path.join(base_path, relative_path)
+            
+            # El tamaño y la fecha salen del stat de la entrada, sin otra llamada a getsize
+            pending_files.append((entry.path, relative_path, entry.stat()))
+        
+        # Reutilizar los hashes de la caché y calcular solo los que faltan
+        cached_hashes = [get_cached_hash(hash_cache, relative_path, file_stat)
+                         for _, relative_path, file_stat in pending_files]
+        files_to_hash = [(file_path, file_stat.st_size)
+                         for (file_path, _, file_stat), cached_hash in zip(pending_files, cached_hashes)
+                         if cached_hash is None]
+        if hash_cache is not None:
+            print(f"Hashes reutilizados de la caché: {len(pending_files) - len(files_to_hash)}")
+        
+        # Calcular los hashes en paralelo (hashlib libera el GIL);
+        # map conserva el orden original y los mensajes se imprimen aquí
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            computed_hashes = executor.map(calculate_sha256,
+                                           [file_path for file_path, _ in files_to_hash],
+                                           [file_size for _, file_size in files_to_hash])
+            for (file_path, relative_path, file_stat), file_hash in zip(pending_files, cached_hashes):
+                if file_hash is None:
+                    file_hash = next(computed_hashes)
+                file_size = file_stat.st_size
                 
                 if file_hash is not None:
-                    files_info.append({
-                        "path": relative_path,
-                        "size": file_size,
-                        "sha256": file_hash
-                    })
+                    update_hash_cache(hash_cache, relative_path, file_stat, file_hash)
+                    paths.append(relative_path)
+                    sizes.append(file_size)
+                    sha256s.append(file_hash)
                     print(f"Procesado: {relative_path} ({file_size} bytes)")
                 else:
                     print(f"Error: No se pudo procesar {relative_path}")
@@ -74,18 +193,29 @@ def scan_directory(directory_path, base_path=""):
     except Exception as e:
         print(f"Error al escanear directorio {directory_path}: {e}")
     
-    return files_info
+    return [{"path": path, "size": size, "sha256": sha256}
+            for path, size, sha256 in zip(paths, sizes, sha256s)]
 
 def generate_manifest_hash(manifest_data):
     """Genera un hash SHA256 del contenido del manifest (sin incluir manifest_hash)"""
-    # Crear una copia del manifest sin la clave manifest_hash
-    manifest_copy = manifest_data.copy()
-    if 'manifest_hash' in manifest_copy:
-        del manifest_copy['manifest_hash']
-    
-    # Convertir a JSON y calcular hash
-    manifest_json = json.dumps(manifest_copy, sort_keys=True, separators=(',', ':'))
-    return hashlib.sha256(manifest_json.encode('utf-8')).hexdigest()
+    # Quitar temporalmente la clave manifest_hash en lugar de copiar el manifest; se guardan los
+    # nombres de las claves que la siguen para devolverla a su posición original
+    has_hash = 'manifest_hash' in manifest_data
+    if has_hash:
+        keys = list(manifest_data)
+        following_keys = keys[keys.index('manifest_hash') + 1:]
+    stored_hash = manifest_data.pop('manifest_hash', None)
+    try:
+        # Convertir a JSON y calcular hash; json.dumps en una sola llamada usa el codificador en C,
+        # que es más rápido que iterencode (Python puro) aunque construya el JSON completo en memoria
+        manifest_json = json.dumps(manifest_data, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(manifest_json.encode('utf-8')).hexdigest()
+    finally:
+        if has_hash:
+            manifest_data['manifest_hash'] = stored_hash
+            # Volver a mover al final las claves que estaban después, en el mismo orden
+            for following_key in following_keys:
+                manifest_data[following_key] = manifest_data.pop(following_key)
 
 def validate_manifest_hash(manifest_data):
     """Valida que el manifest_hash del archivo es correcto"""
@@ -103,6 +233,16 @@ def validate_manifest_hash(manifest_data):
     else:
         return False, f"❌ Hash inválido!\n  Almacenado: {stored_hash}\n  Calculado:  {calculated_hash}"
 
+def positive_int(value):
+    """Tipo de argparse para enteros mayores o iguales a 1"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{value}' no es un número entero")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"debe ser al menos 1 (se recibió {number})")
+    return number
+
 def parse_arguments():
     """Parsea los argumentos de línea de comandos"""
     parser = argparse.ArgumentParser(
@@ -135,6 +275,25 @@ Ejemplos de uso:
         help='No validar el hash del manifest después de generarlo'
     )
     
+    parser.add_argument(
+        '-w', '--workers',
+        type=positive_int,
+        default=None,
+        help='Cantidad de archivos que se hashean en paralelo (por defecto: número de CPUs)'
+    )
+    
+    parser.add_argument(
+        '--cache',
+        default=None,
+        help='Archivo de caché de hashes (por defecto: manifest/<carpeta de origen>_hash_cache.json)'
+    )
+    
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Calcular el hash de todos los archivos sin usar la caché'
+    )
+    
     return parser.parse_args()
 
 def main():
@@ -166,6 +325,17 @@ def main():
     version = read_version(version_file)
     print(f"Versión del juego: {version}")
     
+    # Cargar la caché de hashes de ejecuciones anteriores
+    hash_cache = None
+    cache_file = None
+    if not args.no_cache:
+        cache_file = args.cache
+        if cache_file is None:
+            source_name = os.path.basename(os.path.normpath(source_dir))
+            cache_file = os.path.join("manifest", f"{source_name}_hash_cache.json")
+        print(f"Caché de hashes: {cache_file}")
+        hash_cache = load_hash_cache(cache_file)
+    
     # Crear estructura del manifest
     manifest = {
         "version": version,
@@ -175,53 +345,57 @@ def main():
     # Procesar archivos en la raíz de la carpeta de origen
     # NOTA: files_manifest.json se excluye para evitar dependencia circular en el hash
     print(f"\nProcesando archivos en la raíz de {source_dir}...")
-    for item in os.listdir(source_dir):
-        item_path = os.path.join(source_dir, item)
-        if os.path.isfile(item_path) and item != "files_manifest.json":
-            file_hash = calculate_sha256(item_path)
-            file_size = get_file_size(item_path)
-            
-            if file_hash is not None:
-                manifest["files"].append({
-                    "path": item,
-                    "size": file_size,
-                    "sha256": file_hash
-                })
-                print(f"Procesado: {item} ({file_size} bytes)")
+    with os.scandir(source_dir) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.name != "files_manifest.json":
+                file_stat = entry.stat()
+                file_hash = get_cached_hash(hash_cache, entry.name, file_stat)
+                if file_hash is None:
+                    file_hash = calculate_sha256(entry.path, file_stat.st_size)
+                file_size = file_stat.st_size
+                
+                if file_hash is not None:
+                    update_hash_cache(hash_cache, entry.name, file_stat, file_hash)
+                    manifest["files"].append({
+                        "path": entry.name,
+                        "size": file_size,
+                        "sha256": file_hash
+                    })
+                    print(f"Procesado: {entry.name} ({file_size} bytes)")
     
     # Procesar archivos en Edupie_Data
     edupie_data_dir = os.path.join(source_dir, "Edupie_Data")
     if os.path.exists(edupie_data_dir):
         print(f"\nProcesando archivos en Edupie_Data...")
-        edupie_files = scan_directory(edupie_data_dir, "Edupie_Data")
+        edupie_files = scan_directory(edupie_data_dir, "Edupie_Data", hash_cache, args.workers)
         manifest["files"].extend(edupie_files)
     
     # Calcular tamaño total del build
     build_total_size = sum(file_info["size"] for file_info in manifest["files"])
     manifest["build_total_size"] = build_total_size
     
-    # Guardar el manifest SIN el hash primero
     try:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(manifest, f, indent=2, ensure_ascii=False)
-        
-        print(f"\nManifest guardado temporalmente: {output_file}")
-        print(f"Total de archivos procesados: {len(manifest['files'])}")
+        print(f"\nTotal de archivos procesados: {len(manifest['files'])}")
         print(f"Tamaño total del build: {build_total_size:,} bytes ({build_total_size / (1024*1024*1024):.2f} GB)")
         
-        # Generar hash del manifest DESPUÉS de guardar el archivo
+        # Generar hash del manifest (no depende del archivo guardado)
         print("\nGenerando hash del manifest...")
         manifest_hash = generate_manifest_hash(manifest)
         
         # Agregar el hash al manifest
         manifest["manifest_hash"] = manifest_hash
         
-        # Guardar el manifest FINAL con el hash
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        # Guardar el manifest FINAL con el hash en una sola escritura
+        save_json(output_file, manifest)
         
+        print(f"Manifest guardado: {output_file}")
         print(f"Hash del manifest: {manifest_hash}")
         
+        # Guardar la caché solo con los archivos que siguen existiendo
+        if hash_cache is not None:
+            current_paths = {file_info["path"] for file_info in manifest["files"]}
+            save_hash_cache(cache_file, {path: info for path, info in hash_cache.items() if path in current_paths})
+        
         # Validar el hash del manifest (a menos que se especifique --no-validate)
         if not args.no_validate:
             print("\nValidando hash del manifest...")
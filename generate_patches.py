@@ -1,9 +1,30 @@
 import os
+import argparse
 import hashlib
 import json
+import mmap
 import subprocess
 import zipfile
 import shutil
+import ssl
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+# Extensión opcional de xdelta3 para generar parches en memoria sin lanzar un proceso por archivo.
+# Algunas builds se importan pero fallan al codificar (el wheel 0.0.5 lanza SystemError en
+# Python 3.10+): se prueba una vez con datos pequeños y, si falla, se usa siempre xdelta3.exe
+try:
+    import xdelta3
+    xdelta3.encode(bytes(range(256)) * 16, bytes(range(256)) * 15 + bytes(256))
+except Exception:
+    xdelta3 = None
+
+# orjson (opcional) serializa el JSON indentado en C, mucho más rápido que json.dump
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Configuración de carpetas
 OLD_DIR = 'Old'
@@ -11,42 +32,275 @@ NEW_DIR = 'New'
 PATCHES_DIR = 'Patches'
 XDELTA_EXECUTABLE = os.path.join('Utils', 'xdelta3.exe')
 
-# Tipos de archivos y carpetas a ignorar
-IGNORED_EXTENSIONS = ['.log', '.pdb', '.bak']
-IGNORED_FOLDERS = ['Temp', 'Logs']
+# Tamaño máximo de archivo para generar el parche en memoria con la extensión xdelta3;
+# los archivos más grandes siempre usan xdelta3.exe
+XDELTA_IN_MEMORY_MAX_SIZE = 64 * 1024 * 1024
 
-def should_ignore(file_path):
-    return (
-        any(ignored in file_path.split(os.sep) for ignored in IGNORED_FOLDERS) or
-        any(file_path.endswith(ext) for ext in IGNORED_EXTENSIONS)
-    )
+# Tamaño del bloque de lectura al calcular hashes (1 MiB)
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Los archivos menores a este tamaño se leen y hashean en una sola llamada (1 MiB)
+SMALL_FILE_SIZE = 1024 * 1024
+
+# Los archivos mayores a este tamaño se hashean mapeados en memoria (8 MiB)
+MMAP_MIN_SIZE = 8 * 1024 * 1024
+
+# Tamaño del bloque al copiar cada archivo dentro del ZIP (4 MiB)
+ZIP_COPY_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Rondas de 1 MiB del benchmark de SHA256 que se muestra al iniciar
+SHA256_BENCHMARK_ROUNDS = 8
+
+# Tamaño de los bloques al comparar archivos del mismo tamaño (16 MiB)
+COMPARE_CHUNK_SIZE = 16 * 1024 * 1024
+
+# Con --store-new-files, los archivos nuevos o menores a este tamaño se copian sin generar parche xdelta (1 KiB)
+STORE_MAX_SIZE = 1024
+
+# Versión de formato que se escribe en patch_manifest.json cuando incluye entradas copiadas ('mode': 'store');
+# sin --store-new-files se mantiene el formato original (sin format_version ni mode) que leen los actualizadores actuales
+STORE_MANIFEST_FORMAT_VERSION = 2
+
+# Extensiones que se guardan en el ZIP sin volver a comprimir
+STORED_EXTENSIONS = ('.xdelta',)
+
+# Tipos de archivos y carpetas a ignorar (tupla para str.endswith y frozenset para búsquedas rápidas)
+IGNORED_EXTENSIONS = ('.log', '.pdb', '.bak')
+IGNORED_FOLDERS = frozenset(('Temp', 'Logs'))
 
 def compute_sha256(file_path):
-    hash_sha256 = hashlib.sha256()
-    with open(file_path, "rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
-            hash_sha256.update(chunk)
+    # Según el tamaño: menos de 1 MiB se lee en una sola llamada, más de 8 MiB se hashea
+    # mapeado en memoria y en medio se usa hashlib.file_digest (Python 3.11+) o, en versiones
+    # anteriores, readinto sobre un buffer reutilizado de 1 MiB
+    with open(file_path, "rb", buffering=0) as f:
+        file_size = os.fstat(f.fileno()).st_size
+        if file_size < SMALL_FILE_SIZE:
+            return hashlib.sha256(f.read()).hexdigest()
+        if file_size > MMAP_MIN_SIZE:
+            # El kernel carga las páginas bajo demanda y hashlib procesa todo el mapeo en una llamada
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return hashlib.sha256(mapped).hexdigest()
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        hash_sha256 = hashlib.sha256()
+        buffer = bytearray(HASH_CHUNK_SIZE)
+        view = memoryview(buffer)
+        while True:
+            read = f.readinto(buffer)
+            if not read:
+                break
+            hash_sha256.update(view[:read])
     return hash_sha256.hexdigest()
 
+def report_sha256_backend():
+    # Muestra la versión de OpenSSL que usa hashlib y mide la velocidad de SHA256 en este equipo;
+    # es solo informativo: no hay una forma portable de saber si el CPU tiene SHA-NI (en Windows,
+    # IsProcessorFeaturePresent no tiene una constante para las extensiones SHA de x86)
+    print(f"Backend SHA256: {ssl.OPENSSL_VERSION}")
+    data = bytes(HASH_CHUNK_SIZE)
+    start = time.perf_counter()
+    for _ in range(SHA256_BENCHMARK_ROUNDS):
+        hashlib.sha256(data).digest()
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    throughput = SHA256_BENCHMARK_ROUNDS * len(data) / (1024 * 1024) / elapsed
+    print(f"Velocidad de SHA256: {throughput:,.0f} MB/s")
+
+def walk_files(base_dir, skipped_folders=frozenset()):
+    # Recorrido con os.scandir en el mismo orden que os.walk (archivos y luego subcarpetas);
+    # no entra en las carpetas cuyo nombre esté en skipped_folders
+    subdirs = []
+    with os.scandir(base_dir) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in skipped_folders:
+                    subdirs.append(entry.path)
+            elif entry.is_file():
+                yield entry
+    for subdir in subdirs:
+        yield from walk_files(subdir, skipped_folders)
+
 def relative_file_list(base_dir):
     file_list = []
-    for root, _, files in os.walk(base_dir):
-        for file in files:
-            rel_dir = os.path.relpath(root, base_dir)
-            rel_file = os.path.join(rel_dir, file) if rel_dir != '.' else file
-            if not should_ignore(rel_file):
-                file_list.append(rel_file)
+    # Referencias locales para no buscarlas en os/os.path en cada archivo
+    append = file_list.append
+    relpath = os.path.relpath
+    sep = os.sep
+    for entry in walk_files(base_dir, IGNORED_FOLDERS):
+        if entry.name.endswith(IGNORED_EXTENSIONS):
+            continue
+        # Rutas con '/' desde el inicio: sirven tanto para el manifest como para abrir archivos
+        append(relpath(entry.path, base_dir).replace(sep, '/'))
     return file_list
 
-def ensure_patch_dir(path):
-    full_path = os.path.join(PATCHES_DIR, os.path.dirname(path))
-    os.makedirs(full_path, exist_ok=True)
+def generate_patch_in_memory(old_path, new_path, patch_path):
+    # Retorna False si la extensión no está disponible o no puede generar el parche
+    if xdelta3 is None:
+        return False
+
+    if os.path.getsize(new_path) > XDELTA_IN_MEMORY_MAX_SIZE:
+        return False
+    if os.path.getsize(old_path) > XDELTA_IN_MEMORY_MAX_SIZE:
+        return False
+
+    with open(new_path, 'rb') as f:
+        new_data = f.read()
+    with open(old_path, 'rb') as f:
+        old_data = f.read()
+
+    try:
+        delta = xdelta3.encode(old_data, new_data)
+    except Exception:
+        # NoDeltaFound (delta más grande que el archivo) o builds de la extensión incompatibles
+        return False
+
+    with open(patch_path, 'wb') as pf:
+        pf.write(delta)
+    return True
 
 def generate_patch(old_path, new_path, patch_path):
+    # old_path es None para archivos nuevos: se codifican con xdelta3.exe contra NUL
+    if old_path is not None and generate_patch_in_memory(old_path, new_path, patch_path):
+        return
+
     subprocess.run([
-        XDELTA_EXECUTABLE, '-e', '-s', old_path, new_path, patch_path
+        XDELTA_EXECUTABLE, '-e', '-s', old_path if old_path is not None else 'NUL', new_path, patch_path
     ], check=True)
 
+def files_are_equal(old_path, new_path, file_size):
+    # Compara dos archivos del mismo tamaño por bloques mapeados en memoria, sin hashearlos;
+    # las páginas quedan en la caché del sistema para xdelta3 si resultan distintos
+    if file_size == 0:
+        return True
+    with open(old_path, 'rb') as old_f, open(new_path, 'rb') as new_f, \
+            mmap.mmap(old_f.fileno(), 0, access=mmap.ACCESS_READ) as old_map, \
+            mmap.mmap(new_f.fileno(), 0, access=mmap.ACCESS_READ) as new_map:
+        for offset in range(0, file_size, COMPARE_CHUNK_SIZE):
+            end = offset + COMPARE_CHUNK_SIZE
+            if old_map[offset:end] != new_map[offset:end]:
+                return False
+    return True
+
+# Hilo de cada proceso de trabajo que calcula el hash del archivo nuevo mientras se genera
+# el parche (hashlib y xdelta3.exe liberan el GIL); se crea la primera vez que se usa
+hash_executor = None
+
+def get_hash_executor():
+    global hash_executor
+    if hash_executor is None:
+        hash_executor = ThreadPoolExecutor(max_workers=1)
+    return hash_executor
+
+def process_file(rel_path, patches_subfolder, store_new_files=False):
+    # Genera el parche de un archivo y retorna (estado, parche, modo, tamaño, sha256), o None si no cambió;
+    # una tupla se envía entre procesos más rápido que un diccionario
+    old_file = os.path.join(OLD_DIR, rel_path)
+    new_file = os.path.join(NEW_DIR, rel_path)
+
+    # Un solo stat por archivo: el tamaño sirve para comparar y para el manifest
+    new_size = os.stat(new_file).st_size
+    try:
+        old_size = os.stat(old_file).st_size
+    except FileNotFoundError:
+        old_size = None
+
+    if old_size is None:
+        status = 'NUEVO'
+    else:
+        # Si los tamaños difieren el archivo cambió y no hace falta leer el anterior
+        if old_size == new_size and files_are_equal(old_file, new_file, new_size):
+            return None
+        status = 'MODIFICADO'
+
+    # Solo se calcula el hash de los archivos que cambiaron
+    new_hash_future = get_hash_executor().submit(compute_sha256, new_file)
+
+    if store_new_files and (old_size is None or new_size < STORE_MAX_SIZE):
+        # Archivos nuevos o muy pequeños: un parche xdelta no ahorra nada, se copian tal cual
+        mode = 'store'
+        patch_name = rel_path + '.new'
+        shutil.copyfile(new_file, os.path.join(patches_subfolder, patch_name))
+    else:
+        mode = 'xdelta'
+        patch_name = rel_path + '.xdelta'
+        generate_patch(old_file if old_size is not None else None, new_file,
+                       os.path.join(patches_subfolder, patch_name))
+
+    return status, patch_name, mode, new_size, new_hash_future.result()
+
+def save_json(file_path, data):
+    # Guarda un objeto como JSON indentado (con orjson si está disponible)
+    if orjson is not None:
+        try:
+            content = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        except TypeError:
+            # Datos que orjson no soporta (p. ej. enteros de más de 64 bits): usar json estándar
+            content = None
+        if content is not None:
+            with open(file_path, 'wb') as f:
+                f.write(content)
+            return
+    # newline='\n': saltos de línea LF en todos los sistemas, igual que la salida de orjson
+    with open(file_path, 'w', encoding='utf-8', newline='\n') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+class PatchManifestWriter:
+    """Escribe patch_manifest.json entrada por entrada, a medida que llegan los resultados
+
+    El archivo queda con el mismo formato que json.dump(manifest, indent=2, ensure_ascii=False)
+    sin tener todas las entradas en memoria. Se escribe en <manifest>.tmp y solo se mueve a su
+    nombre final si no hubo errores, para que un parche fallido no deje un manifest que parezca completo.
+    """
+
+    def __init__(self, file_path, version, include_mode=False):
+        # include_mode agrega format_version y el campo mode de cada entrada (solo con --store-new-files)
+        self.include_mode = include_mode
+        self.file_path = file_path
+        self.temp_path = file_path + '.tmp'
+        # Saltos de línea LF en todos los sistemas, igual que save_json
+        self.file = open(self.temp_path, 'w', encoding='utf-8', newline='\n')
+        self.file.write('{\n  "version": ' + json.dumps(version, ensure_ascii=False) + ',\n')
+        if include_mode:
+            self.file.write(f'  "format_version": {STORE_MANIFEST_FORMAT_VERSION},\n')
+        self.file.write('  "patch_files": [')
+        self.entry_count = 0
+
+    def write_entry(self, path, patch, mode, size, sha256):
+        entry = {
+            'path': path,
+            'patch': patch
+        }
+        if self.include_mode:
+            entry['mode'] = mode
+        entry['size'] = size
+        entry['sha256'] = sha256
+        separator = ',\n    ' if self.entry_count else '\n    '
+        # Las entradas van dentro de la lista: indentar cada línea 4 espacios
+        entry_json = json.dumps(entry, indent=2, ensure_ascii=False).replace('\n', '\n    ')
+        self.file.write(separator + entry_json)
+        self.entry_count += 1
+
+    def close(self):
+        self.file.write('\n  ]\n}' if self.entry_count else ']\n}')
+        self.file.close()
+        os.replace(self.temp_path, self.file_path)
+
+    def discard(self):
+        # Descarta el manifest incompleto sin tocar el archivo final
+        self.file.close()
+        try:
+            os.remove(self.temp_path)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
 def read_version(version_file_path):
     if not os.path.exists(version_file_path):
         raise FileNotFoundError(f"No se encuentra el archivo de versión: {version_file_path}")
@@ -55,51 +309,30 @@ def read_version(version_file_path):
         return vf.read().strip()
 
 def create_zip_archive(patch_folder, zip_name):
+    # Crea el ZIP sumando en la misma pasada el tamaño descomprimido;
+    # retorna (tamaño descomprimido, tamaño del ZIP, sha256 del ZIP)
+    uncompressed_size = 0
+    # Se escribe sobre un archivo con seek para que zipfile complete el CRC y los tamaños en
+    # cada cabecera local (sin data descriptor), como necesitan los descompresores en streaming
     with zipfile.ZipFile(zip_name, 'w', zipfile.ZIP_DEFLATED) as zipf:
-        for root, dirs, files in os.walk(patch_folder):
-            for file in files:
-                file_path = os.path.join(root, file)
-                arcname = os.path.relpath(file_path, patch_folder)
-                zipf.write(file_path, arcname)
-
-def calculate_zip_hash(zip_filename):
-    """Calcula el hash SHA256 del archivo ZIP"""
-    try:
-        sha256_hash = hashlib.sha256()
-        with open(zip_filename, "rb") as f:
-            # Leer el archivo en chunks para archivos grandes
-            for chunk in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(chunk)
-        
-        hash_value = sha256_hash.hexdigest()
-        print(f"Hash SHA256 del ZIP: {hash_value}")
-        return hash_value
-    except Exception as e:
-        print(f"Error al calcular hash del ZIP: {e}")
-        return None
-
-def get_zip_size(zip_filename):
-    """Obtiene el tamaño del archivo ZIP en bytes"""
-    try:
-        size = os.path.getsize(zip_filename)
-        print(f"Tamaño del ZIP: {size:,} bytes ({size / (1024*1024):.2f} MB)")
-        return size
-    except Exception as e:
-        print(f"Error al obtener tamaño del ZIP: {e}")
-        return 0
-
-def calculate_uncompressed_size(patch_folder):
-    """Calcula el tamaño total descomprimido de la carpeta del parche"""
-    total_size = 0
-    try:
-        for root, dirs, files in os.walk(patch_folder):
-            for file in files:
-                file_path = os.path.join(root, file)
-                total_size += os.path.getsize(file_path)
-        return total_size
-    except Exception as e:
-        print(f"Error al calcular tamaño descomprimido: {e}")
-        return 0
+        for entry in walk_files(patch_folder):
+            zinfo = zipfile.ZipInfo.from_file(entry.path, os.path.relpath(entry.path, patch_folder))
+            # El tamaño viene del stat que os.scandir ya dejó en caché
+            uncompressed_size += entry.stat().st_size
+            # Los parches de xdelta ya vienen comprimidos: deflate solo gastaría CPU
+            if entry.name.endswith(STORED_EXTENSIONS):
+                zinfo.compress_type = zipfile.ZIP_STORED
+            else:
+                zinfo.compress_type = zipfile.ZIP_DEFLATED
+            # Copiar en bloques grandes en lugar de los 8 KiB que usa ZipFile.write
+            with open(entry.path, 'rb', buffering=0) as src, zipf.open(zinfo, 'w') as dst:
+                shutil.copyfileobj(src, dst, ZIP_COPY_CHUNK_SIZE)
+    # El hash se calcula releyendo el ZIP terminado: esto cuesta una lectura completa del archivo
+    # (en parches de cientos de MB, en parte servida desde la caché del sistema porque acaba de
+    # escribirse), pero es el precio de tener el CRC y los tamaños reales en cada cabecera local.
+    # Hashear mientras se escribe exige un archivo sin seek, y entonces zipfile deja tamaños en cero
+    # en las cabeceras locales (data descriptor), que los descompresores en streaming no soportan
+    return uncompressed_size, os.path.getsize(zip_name), compute_sha256(zip_name)
 
 def generate_patch_info(old_version, new_version, tag, filename, download_url, compressed_size, uncompressed_size, sha256):
     """Genera la estructura JSON de información del parche"""
@@ -115,7 +348,32 @@ def generate_patch_info(old_version, new_version, tag, filename, download_url, c
         }
     }
 
+def parse_arguments():
+    """Parsea los argumentos de línea de comandos"""
+    parser = argparse.ArgumentParser(
+        description="Genera los parches delta entre las carpetas Old y New",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Ejemplos de uso:
+  python generate_patches.py                     # Todos los archivos como parches .xdelta
+  python generate_patches.py --store-new-files   # Copia los archivos nuevos y pequeños como .new
+        """
+    )
+    
+    parser.add_argument(
+        '--store-new-files',
+        action='store_true',
+        help=f'Copiar tal cual (.new) los archivos nuevos y los menores a {STORE_MAX_SIZE} bytes en lugar de '
+             f'generar parches xdelta; el manifest pasa al formato {STORE_MANIFEST_FORMAT_VERSION} con el campo '
+             f'mode, que solo entienden los actualizadores que lo soportan'
+    )
+    
+    return parser.parse_args()
+
 def main():
+    # Parsear argumentos
+    args = parse_arguments()
+    
     # Leer versiones
     old_version_file = os.path.join(OLD_DIR, 'version.txt')
     new_version_file = os.path.join(NEW_DIR, 'version.txt')
@@ -128,6 +386,7 @@ def main():
         return
 
     print(f"Generando parche de v{old_version} a v{new_version}...")
+    report_sha256_backend()
 
     # Crear nombre de la carpeta del parche
     patch_folder_name = f"edupie-patch-v{old_version}-to-v{new_version}"
@@ -138,9 +397,7 @@ def main():
     patch_folder_path = os.path.join(version_folder_path, patch_folder_name)
     patches_subfolder = os.path.join(patch_folder_path, 'patches')
     
-    # Crear estructura de carpetas
-    os.makedirs(version_folder_path, exist_ok=True)
-    os.makedirs(patch_folder_path, exist_ok=True)
+    # Crear estructura de carpetas (makedirs crea también las carpetas padre)
     os.makedirs(patches_subfolder, exist_ok=True)
     
     # Crear archivo version.txt en la carpeta del parche
@@ -148,72 +405,44 @@ def main():
     with open(version_file_path, 'w') as vf:
         vf.write(f"v{old_version}-to-v{new_version}")
     
-    manifest = {
-        'version': new_version,
-        'patch_files': []
-    }
-
     new_files = relative_file_list(NEW_DIR)
 
-    for rel_path in new_files:
-        old_file = os.path.join(OLD_DIR, rel_path)
-        new_file = os.path.join(NEW_DIR, rel_path)
-        patch_file = os.path.join(patches_subfolder, rel_path + '.xdelta')
-
-        # Crear directorio para el parche si es necesario
-        patch_dir = os.path.dirname(patch_file)
-        if patch_dir:
-            os.makedirs(patch_dir, exist_ok=True)
+    # Crear los directorios de los parches antes de repartir el trabajo entre procesos,
+    # una sola vez por carpeta aunque contenga muchos archivos
+    patch_dirs = {os.path.dirname(os.path.join(patches_subfolder, rel_path)) for rel_path in new_files}
+    for patch_dir in sorted(patch_dirs):
+        os.makedirs(patch_dir, exist_ok=True)
 
-        if not os.path.exists(old_file):
-            print(f"[NUEVO] {rel_path}")
-            generate_patch('NUL', new_file, patch_file)
-        else:
-            with open(old_file, 'rb') as f1, open(new_file, 'rb') as f2:
-                if f1.read() == f2.read():
-                    continue
-
-            print(f"[MODIFICADO] {rel_path}")
-            generate_patch(old_file, new_file, patch_file)
-
-        manifest['patch_files'].append({
-            'path': rel_path.replace("\\", "/"),
-            'patch': (rel_path + '.xdelta').replace("\\", "/"),
-            'size': os.path.getsize(new_file),
-            'sha256': compute_sha256(new_file)
-        })
-
-    # Guardar manifest en la carpeta del parche
+    # Cada archivo se procesa en paralelo (un proceso por CPU; el valor por defecto del pool ya
+    # respeta el límite de 61 procesos de Windows); los mensajes se imprimen desde este proceso.
+    # Las rutas se envían de a una: los archivos grandes de una misma carpeta quedan juntos en
+    # la lista y en un mismo lote se procesarían uno tras otro mientras otros procesos esperan.
+    # El manifest se va guardando en la carpeta del parche a medida que llegan las entradas
     manifest_path = os.path.join(patch_folder_path, 'patch_manifest.json')
-    with open(manifest_path, 'w', encoding='utf-8') as mf:
-        json.dump(manifest, mf, indent=2)
+    process = partial(process_file, patches_subfolder=patches_subfolder, store_new_files=args.store_new_files)
+    with PatchManifestWriter(manifest_path, new_version, include_mode=args.store_new_files) as manifest_writer, \
+            ProcessPoolExecutor() as executor:
+        for rel_path, result in zip(new_files, executor.map(process, new_files)):
+            if result is None:
+                continue
+            status, patch_name, mode, size, sha256 = result
+            print(f"[{status}] {rel_path}")
+            manifest_writer.write_entry(rel_path, patch_name, mode, size, sha256)
     
     print(f"\n✅ Manifest generado: {manifest_path}")
     
     # Crear archivo ZIP
     zip_name = f"{patch_folder_name}.zip"
     zip_path = os.path.join(version_folder_path, zip_name)
-    create_zip_archive(patch_folder_path, zip_path)
+    uncompressed_size, compressed_size, sha256_hash = create_zip_archive(patch_folder_path, zip_path)
     
     print(f"✅ Archivo ZIP creado: {zip_path}")
     print(f"✅ Estructura de carpetas creada: {patch_folder_path}")
     
-    # Calcular tamaños y hash
-    print("\nCalculando información del parche...")
-    
-    # Calcular tamaño descomprimido
-    uncompressed_size = calculate_uncompressed_size(patch_folder_path)
+    print("\nInformación del parche:")
     print(f"Tamaño descomprimido: {uncompressed_size:,} bytes ({uncompressed_size / (1024*1024):.2f} MB)")
-    
-    # Calcular tamaño comprimido
-    compressed_size = get_zip_size(zip_path)
-    
-    # Calcular hash SHA256 del ZIP
-    print("\nCalculando hash SHA256 del archivo ZIP...")
-    sha256_hash = calculate_zip_hash(zip_path)
-    if not sha256_hash:
-        print("Error: No se pudo calcular el hash del ZIP")
-        return
+    print(f"Tamaño del ZIP: {compressed_size:,} bytes ({compressed_size / (1024*1024):.2f} MB)")
+    print(f"Hash SHA256 del ZIP: {sha256_hash}")
     
     # Generar información del parche
     tag = f"edupie-patch-v{old_version}-to-v{new_version}-pre"
@@ -235,8 +464,7 @@ def main():
     patch_info_path = os.path.join(version_folder_path, patch_info_filename)
     
     try:
-        with open(patch_info_path, 'w', encoding='utf-8') as f:
-            json.dump(patch_info, f, indent=2, ensure_ascii=False)
+        save_json(patch_info_path, patch_info)
         
         print(f"\n✅ Información del parche generada exitosamente: {patch_info_path}")
         print(f"📦 Archivo ZIP: {zip_path}")